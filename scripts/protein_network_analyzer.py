@@ -1,7 +1,12 @@
 # %%
 import os
+import numpy as np
 import pandas as pd
-from itertools import combinations
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+# number of protein pairs filtered per block, sized so each block's lookups stay cache resident
+PAIR_BLOCK_SIZE = 1 << 16
 
 class ProteinNetworkAnalyzer:
     """
@@ -27,14 +32,20 @@ class ProteinNetworkAnalyzer:
     interactions_sorted : pd.DataFrame
         Interactions sorted in a standard order
 
-    all_pairs : pd.DataFrame
-        All possible unique protein pairs
+    protein_index : pd.Index
+        Maps protein IDs to integer protein codes (row position in proteins)
+
+    all_pairs : tuple of np.ndarray
+        All possible unique protein pairs, as int32 protein_A and protein_B code arrays
+
+    observed_pair_keys : np.ndarray
+        Sorted, unique uint64 pair keys of the known (sorted) interactions
 
-    networks : dict
-        Connected networks of the interaction network
+    network_labels : np.ndarray
+        int32 connected network label of each protein code
 
-    protein_network_map : dict
-        Maps proteins to their connected networks
+    compartment_lut : np.ndarray
+        int32 compartment code of each protein code
 
     """
 
@@ -55,21 +66,26 @@ class ProteinNetworkAnalyzer:
 
         """
 
-        # load all proteins into a DataFrame
-        self.proteins = pd.read_csv(proteins_file, names=['protein'])
+        # load all proteins into a DataFrame (duplicate IDs dropped, so each protein has a single code)
+        self.proteins = pd.read_csv(proteins_file, names=['protein'], engine='pyarrow').drop_duplicates(ignore_index=True)
+        self.protein_index = pd.Index(self.proteins['protein'])
         # load proteins and there annotated cell compartment into a DataFrame
-        self.compartments = pd.read_csv(compartments_file)
+        self.compartments = pd.read_csv(compartments_file, engine='pyarrow')
         self.compartment_dict = self.compartments.set_index('protein_id')['compartment_id'].to_dict()
         # load the observed protein-protein interactions into a DataFrame
-        self.interactions = pd.read_csv(interactions_file, sep=' ', header=None, names=['protein_A', 'protein_B'])
+        self.interactions = pd.read_csv(interactions_file, sep=' ', header=None, names=['protein_A', 'protein_B'], engine='pyarrow')
         # sort the observed protein-protein interactions so they are ordered by increasing protein ID (numerical)
         self.interactions_sorted = self.rank_order_interactions()
         # generate all theoretically possible protein-protein interactions
         self.all_pairs = self.generate_all_pairs()
-        # find indirect-interaction network on observed protein-protein interactions using Union-Find algorithm
-        self.networks = self.find_connected_networks()
-        # map indirect-interactions into subgraph networks
-        self.protein_network_map = self.create_protein_network_map()
+        # pack observed protein-protein interactions into sorted integer pair keys (sorted once for lookups)
+        self.observed_pair_keys = np.unique(self.encode_pair_keys(
+            self.protein_index.get_indexer(self.interactions_sorted['protein_A']),
+            self.protein_index.get_indexer(self.interactions_sorted['protein_B'])))
+        # find indirect-interaction network of each protein on observed protein-protein interactions
+        self.network_labels = self.find_connected_networks()
+        # build per-protein-code compartment lookup array for the pair filters
+        self.compartment_lut = self.build_lookup_table(self.compartments['protein_id'], self.compartments['compartment_id'])
 
     def rank_order_interactions(self):
         """
@@ -81,16 +97,18 @@ class ProteinNetworkAnalyzer:
             DataFrame of sorted interactions.
 
         """
-        interactions_sorted = self.interactions.copy()
-
-        def reorder(row):
-            num_a = int(''.join(filter(str.isdigit, row['protein_A'])))
-            num_b = int(''.join(filter(str.isdigit, row['protein_B'])))
-            if num_a > num_b:
-                row['protein_A'], row['protein_B'] = row['protein_B'], row['protein_A']
-            return row
-
-        interactions_sorted = interactions_sorted.apply(reorder, axis=1)
+        a = self.interactions['protein_A']
+        b = self.interactions['protein_B']
+
+        # extract the numerical part (all digits) of each protein ID and swap columns where protein_A > protein_B
+        num_a = a.str.replace(r'\D', '', regex=True).astype(np.int64)
+        num_b = b.str.replace(r'\D', '', regex=True).astype(np.int64)
+        swap = (num_a > num_b).to_numpy()
+
+        interactions_sorted = pd.DataFrame({
+            'protein_A': np.where(swap, b, a),
+            'protein_B': np.where(swap, a, b)},
+            index=self.interactions.index)
         return interactions_sorted
 
     def generate_all_pairs(self):
@@ -99,139 +117,269 @@ class ProteinNetworkAnalyzer:
 
         Returns
         ----------
-        all_pairs : pd.DataFrame
-            DataFrame containing all possible pairs.
+        all_pairs : tuple of np.ndarray
+            int32 protein_A and protein_B code arrays of all possible pairs.
             
         """
-        all_pairs = pd.DataFrame(combinations(self.proteins['protein'], 2), columns=['protein_A', 'protein_B'])
+        i, j = np.triu_indices(len(self.proteins), k=1)
+        all_pairs = (i.astype(np.int32), j.astype(np.int32))
         return all_pairs
 
-    def select_crosscompartment_unobserved_interactions(self):
+    def encode_pair_keys(self, codes_a, codes_b):
+        """
+        Packs each protein pair into a single uint64 key (protein_A code in the high 32 bits,
+        protein_B code in the low 32 bits), so pairs can be compared with vectorized set operations.
+
+        Parameters
+        ----------
+        codes_a : np.ndarray
+            protein_A codes
+
+        codes_b : np.ndarray
+            protein_B codes
+
+        Returns
+        ----------
+        pair_keys : np.ndarray
+            uint64 array of pair keys.
+
+        """
+        pair_keys = (codes_a.astype(np.uint64) << np.uint64(32)) | codes_b.astype(np.uint64)
+        return pair_keys
+
+    def build_lookup_table(self, protein_ids, values):
+        """
+        Converts protein -> value annotations into a dense int32 array of categorical codes indexed by protein code.
+
+        Proteins without an annotation each get their own (negative) code, so they never
+        compare equal to another protein.
+
+        Parameters
+        ----------
+        protein_ids : array-like
+            Annotated protein IDs
+
+        values : array-like
+            Compartment of each annotated protein
+
+        Returns
+        ----------
+        lut : np.ndarray
+            int32 array of value codes, indexed by protein code.
+
+        """
+        value_codes = pd.Categorical(values).codes
+        positions = self.protein_index.get_indexer(protein_ids)
+        known = positions >= 0
+
+        lut = np.full(len(self.proteins), -1, dtype=np.int32)
+        lut[positions[known]] = value_codes[known]
+        missing = np.flatnonzero(lut < 0)
+        lut[missing] = -1 - missing
+        return lut
+
+    def pairs_to_frame(self, mask):
+        """
+        Materializes the selected protein pairs into a DataFrame.
+
+        Parameters
+        ----------
+        mask : np.ndarray
+            Boolean selection over all_pairs
+
+        Returns
+        ----------
+        pairs : pd.DataFrame
+            DataFrame of the selected protein pairs and their compartments.
+
+        """
+        index = np.flatnonzero(mask)
+        codes_a, codes_b = self.all_pairs[0][index], self.all_pairs[1][index]
+        proteins = self.protein_index.to_numpy()
+        compartments = self.proteins['protein'].map(self.compartment_dict).to_numpy()
+        pairs = pd.DataFrame({
+            'protein_A': proteins[codes_a],
+            'protein_B': proteins[codes_b],
+            'compartment_A': compartments[codes_a],
+            'compartment_B': compartments[codes_b]},
+            index=index)
+        return pairs
+
+    def _compute_crosscompartment_unobserved_mask(self):
+        """
+        Computes the boolean selection over all_pairs of cross-cell-compartment, unobserved interactions.
+
+        Returns
+        ----------
+        mask : np.ndarray
+            Boolean array, True for selected pairs.
+
+        """
+        observed_pair_keys = self.observed_pair_keys
+
+        def select(codes_a, codes_b):
+            # cross-compartment interactions selection
+            cc = self.compartment_lut[codes_a] != self.compartment_lut[codes_b]
+            # mask for observed interactions among the cross-compartment pairs
+            # (binary search into the observed keys, which are sorted once in __init__)
+            candidates = np.flatnonzero(cc)
+            pair_keys = self.encode_pair_keys(codes_a[candidates], codes_b[candidates])
+            observed = np.zeros(len(codes_a), dtype=bool)
+            if len(observed_pair_keys):
+                pos = np.minimum(np.searchsorted(observed_pair_keys, pair_keys), len(observed_pair_keys) - 1)
+                observed[candidates] = observed_pair_keys[pos] == pair_keys
+            # unobserved interactions selection (inverse mask on cross-compartmartment interactions)
+            return cc & ~observed
+
+        return self._compute_blocked_mask(select)
+
+    def select_crosscompartment_unobserved_interactions(self, as_mask=False):
         """
         Identifies interaction pairs that are cross-cell-ompartment and 
         outside the known (unobserved) interactions set
 
+        Parameters
+        ----------
+        as_mask : bool
+            If True, return the pair codes and selection mask instead of a DataFrame
+
         Returns
         ----------
-        all_pairs_cc_no_observed : pd.DataFrame
-            DataFrame containing only unobserved interactions.
+        all_pairs_cc_no_observed : pd.DataFrame or tuple of np.ndarray
+            DataFrame containing only unobserved interactions, or (codes_A, codes_B, mask) if as_mask.
 
         """
-        pairs = self.all_pairs.copy()
-        pairs['compartment_A'] = pairs['protein_A'].map(self.compartment_dict)
-        pairs['compartment_B'] = pairs['protein_B'].map(self.compartment_dict)
-
-        # cross-compartment interactions selection
-        all_pairs_cc = pairs[
-            (pairs['compartment_A'] != pairs['compartment_B'])]
-        
-        # mask for observed interactions
-        mask = all_pairs_cc.set_index(['protein_A', 'protein_B']).index.isin(
-            self.interactions_sorted.set_index(['protein_A', 'protein_B']).index)
+        mask = self._compute_crosscompartment_unobserved_mask()
+        if as_mask:
+            return (*self.all_pairs, mask)
 
-        # unobserved interactions selection (inverse mask indexing on cross-compartmartment interactions df)
-        all_pairs_cc_no_observed = all_pairs_cc[~mask]
+        all_pairs_cc_no_observed = self.pairs_to_frame(mask)
 
         return all_pairs_cc_no_observed
 
     def find_connected_networks(self):
         """
-        Main method which identifies connected network in the protein interaction network using the Union-Find algorithm.
+        Main method which identifies connected network in the protein interaction network using connected components.
 
-        This method constructs a disjoint-set (Union-Find) structure to determine which proteins are
-        directly or indirectly connected based on known interactions. Each connected network represents
+        This method constructs a sparse adjacency graph of the known interactions and labels its connected
+        components to determine which proteins are directly or indirectly connected. Each connected network represents
         a group of proteins that interact either directly or through a chain of interactions. Each network
         forms a non-joint set (i.e. connection in venn diagram viz), and thus not connected by edges 
-        (protein-protein interaction).
+        (protein-protein interaction). Proteins without any observed interaction form their own network.
 
         Returns
         ----------
-        networks : dict
-            A dictionary where,
-            - Keys are the main root protein (parent) of a connected network.
-            - Values are sets of proteins belonging to that network.
+        network_labels : np.ndarray
+            int32 array of network labels, indexed by protein code.
 
         """
-        main_root = {}
-
-        def find(u):
-            """
-            Finds the main root (parent) of the connected network that protein `u` belongs to.
-            
-            This function implements **path compression** to optimize Union-Find operations.
-            
-            Parameters
-            ----------
-            u : str 
-                The protein ID
-            
-            Returns
-            ----------
-            main_root : str
-                The root protein ID representing the connected network
-                
-            """
-            if main_root[u] != u:
-                main_root[u] = find(main_root[u])
-            return main_root[u]
-
-        # initialize all proteins as their own roots (self-loops initially)
-        all_proteins = set(self.interactions_sorted.protein_A).union(self.interactions_sorted.protein_B)
-        for protein in all_proteins:
-            main_root[protein] = protein  
-
-        # merge network using Union-Find
-        for _, row in self.interactions_sorted.iterrows():
-            u, v = row['protein_A'], row['protein_B']
-            u_root, v_root = find(u), find(v)
-            if u_root != v_root:
-                main_root[v_root] = u_root
-
-        # group proteins by their representative network root
-        networks = {}
-        for protein in all_proteins:
-            root = find(protein)
-            networks.setdefault(root, set()).add(protein)
-
-        return networks
-
-    def create_protein_network_map(self):
-        """
-        Maps each protein to its corresponding connected network ID.
+        # convert proteins into contiguous integer codes; proteins come first so their codes match protein_index,
+        # interacting proteins missing from the protein list are appended so they still link networks
+        codes, all_proteins = pd.factorize(pd.concat([self.proteins['protein'],
+                                                      self.interactions_sorted.protein_A,
+                                                      self.interactions_sorted.protein_B], ignore_index=True))
+        n_interactions = len(self.interactions_sorted)
+        codes_a, codes_b = codes[len(self.proteins):].reshape(2, n_interactions)
+
+        # build the sparse (undirected) adjacency graph and label its connected components
+        n_proteins = len(all_proteins)
+        graph = csr_matrix((np.ones(n_interactions, dtype=np.int8), (codes_a, codes_b)), shape=(n_proteins, n_proteins))
+        _, labels = connected_components(graph, directed=False)
+
+        network_labels = labels[:len(self.proteins)].astype(np.int32)
+        return network_labels
+
+    def _compute_crossnetwork_crosscompartment_mask(self):
+        """
+        Computes the boolean selection over all_pairs of cross-compartment, cross-network pairs.
 
         Returns
         ----------
-        protein_network_map : dict
-            A dictionary mapping proteins to network IDs.
+        mask : np.ndarray
+            Boolean array, True for selected pairs.
 
         """
+        def select(codes_a, codes_b):
+            return ((self.network_labels[codes_a] != self.network_labels[codes_b]) &
+                    (self.compartment_lut[codes_a] != self.compartment_lut[codes_b]))
 
-        protein_network_map = {}
-        for network_id, proteins_set in enumerate(self.networks.values()):
-            for protein in proteins_set:
-                protein_network_map[protein] = network_id
-        return protein_network_map
+        return self._compute_blocked_mask(select)
 
-    def select_crossnetwork_crosscompartment_interactions(self):
+    def _compute_blocked_mask(self, select, block_size=PAIR_BLOCK_SIZE):
+        """
+        Evaluates a pair filter over all_pairs block by block, so the intermediate gathers and
+        comparisons stay small instead of spanning all N*(N-1)/2 pairs at once.
+
+        Parameters
+        ----------
+        select : callable
+            Takes (codes_A, codes_B) of a block and returns its boolean mask
+
+        block_size : int
+            Number of pairs per block
+
+        Returns
+        ----------
+        mask : np.ndarray
+            Boolean array over all_pairs, True for selected pairs.
+
+        """
+        codes_a, codes_b = self.all_pairs
+        mask = np.empty(len(codes_a), dtype=bool)
+        for start in range(0, len(codes_a), block_size):
+            block = slice(start, start + block_size)
+            mask[block] = select(codes_a[block], codes_b[block])
+        return mask
+
+    def select_crossnetwork_crosscompartment_interactions(self, as_mask=False):
         """
         Filters protein pairs that belong to different compartments and different indirect-networks.
         Therefore, only selects for proteins that should not interact (different networks and interaction networks)
 
+        Parameters
+        ----------
+        as_mask : bool
+            If True, return the pair codes and selection mask instead of a DataFrame
+
         Returns
         ----------
-        pairs : pd.DataFrame
-            DataFrame containing filtered protein pairs.
+        pairs : pd.DataFrame or tuple of np.ndarray
+            DataFrame containing filtered protein pairs, or (codes_A, codes_B, mask) if as_mask.
             
         """
-        
-        pairs = self.all_pairs.copy()
-        pairs['compartment_A'] = pairs['protein_A'].map(self.compartment_dict)
-        pairs['compartment_B'] = pairs['protein_B'].map(self.compartment_dict)
-        pairs['network_A'] = pairs['protein_A'].map(self.protein_network_map)
-        pairs['network_B'] = pairs['protein_B'].map(self.protein_network_map)
+        mask = self._compute_crossnetwork_crosscompartment_mask()
+        if as_mask:
+            return (*self.all_pairs, mask)
+
+        codes_a, codes_b = self.all_pairs
+        pairs = self.pairs_to_frame(mask)
+        pairs['network_A'] = self.network_labels[codes_a[mask]]
+        pairs['network_B'] = self.network_labels[codes_b[mask]]
+        return pairs
 
-        return pairs[
-            (pairs['network_A'] != pairs['network_B']) &
-            (pairs['compartment_A'] != pairs['compartment_B']) 
-        ]
+    def save_pairs(self, mask, output_path, chunk_size=1_000_000):
+        """
+        Streams the selected protein pairs to a .csv file in chunks, without materializing a DataFrame.
 
+        Parameters
+        ----------
+        mask : np.ndarray
+            Boolean selection over all_pairs
+
+        output_path : str
+            Path to the output .csv file
+
+        chunk_size : int
+            Number of pairs written per chunk
+
+        """
+        codes_a, codes_b = self.all_pairs
+        proteins = self.protein_index.to_numpy()
+        index = np.flatnonzero(mask)
+
+        with open(output_path, 'w') as fh:
+            fh.write('protein_A,protein_B\n')
+            for start in range(0, len(index), chunk_size):
+                chunk = index[start:start + chunk_size]
+                np.savetxt(fh, np.column_stack([proteins[codes_a[chunk]], proteins[codes_b[chunk]]]),
+                           fmt='%s', delimiter=',')
@@ -1,13 +1,27 @@
 # %%
 import os
+import re
 import numpy as np
 import pandas as pd
 from itertools import product
 
+# Optional bulk scanners for method 3 (hyperscan preferred, pyahocorasick as fallback)
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Get relative path for data directory
 current_path = os.path.dirname(__file__)
 data_dir = os.path.join(current_path, '..', 'task_1')
 
+# Pattern X (T-AV-T-*-T motif), compiled once so pandas does not recompile it on every call
+PATTERN_X = re.compile(r'T[AV]T[A-Z]T')
+
 def diagnose_corruptions(file_path):
     """
     Reads a potentially corrupt CSV file and identifies warnings/issues using pandas.read_csv()
@@ -38,10 +52,11 @@ def clean_protein_file(input_path, output_path):
     protein_df = pd.read_csv(input_path, names=[0, 1, 2, 3], skiprows=1, index_col=0)
 
     # Identify rows where column 2 has missing values (corruption)
-    corrupt_rows = protein_df.loc[protein_df[2].isna()].index
+    col2 = protein_df[2].to_numpy()
+    corrupt_rows = pd.isna(col2)
 
     # Fix the corropted rows: move values from column 3 to column 2
-    protein_df.loc[corrupt_rows, 1] = protein_df.loc[corrupt_rows, 2].values
+    protein_df[2] = np.where(corrupt_rows, protein_df[3].to_numpy(), col2)
 
     # Save cleaned data, keeping only relevant columns (the expected 3 fields)
     protein_df.iloc[:, 0:2].to_csv(output_path, index=True, header=['protein_id', 'sequence'])
@@ -75,8 +90,9 @@ def find_pattern_combinations(df):
     # Generate all combinations that match the pattern (1 x 2 x 1 x 20 x 1) = 40 
     combinations = [''.join(p) for p in product(entry_1, entry_2, entry_3, entry_4, entry_5)]
     print(f'\n{len(combinations)} possible motifs with pattern X combination:', combinations)
-    # Convert list into regex pattern (replace white space with '|')
-    pattern = '|'.join(combinations)  
+    # Collapse the combinations into an equivalent character-class pattern (one class per entry)
+    # instead of a 40-term alternation, which the regex engine would try term by term
+    pattern = re.compile(''.join(f"[{''.join(entry)}]" for entry in (entry_1, entry_2, entry_3, entry_4, entry_5)))
 
     # Find matching motifs in proteins in the dataframe
     matches = df[df.iloc[:, 1].str.contains(pattern, na=False)]
@@ -102,14 +118,69 @@ def find_pattern_regex(df):
         dataframe containing protein hits with matches to pattern X (T-AV-T-*-T motif)
 
     """
-    regex_pattern = r'T[AV]T[A-Z]T'  
-    
-    matches = df[df.iloc[:, 1].str.contains(regex_pattern, regex=True, na=False)]
+    matches = df[df.iloc[:, 1].str.contains(PATTERN_X, na=False)]
     matches.set_index('protein_id', inplace=True)
 
     print('\nIdentified hits using regex:\n', matches)
     return matches
 
+def find_pattern_bulk(df):
+    """
+    Method 3 to search for matching possible hits (bulk scan):
+    Concatenates all protein sequences into one buffer and scans it for the T-AV-T-*-T motif / pattern 
+    in a single pass, using a hyperscan database or (if hyperscan is not installed) an Aho-Corasick 
+    automaton over the concrete motifs. If neither package is installed, the motif is tested on a 
+    uint8 view of the buffer with shifted numpy comparisons.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The cleaned protein_id, sequence dataframe
+
+    Returns
+    -------
+    matches : pd.DataFrame
+        dataframe containing protein hits with matches to pattern X (T-AV-T-*-T motif)
+
+    """
+    # Join sequences with a newline sentinel so no motif can span two proteins
+    # (non-ascii characters are replaced so byte offsets stay aligned with character offsets)
+    sequences = df.iloc[:, 1].fillna('').to_numpy()
+    starts = np.cumsum([0] + [len(seq) + 1 for seq in sequences[:-1]])
+    buffer = '\n'.join(sequences)
+    data = buffer.encode('ascii', errors='replace')
+
+    # Collect the end offset of every motif occurrence in the buffer
+    ends = []
+    if hyperscan is not None:
+        db = hyperscan.Database()
+        db.compile(expressions=[PATTERN_X.pattern.encode()], ids=[0], flags=[0])
+        db.scan(data, match_event_handler=lambda id, start, end, flags, context: ends.append(end - 1))
+    elif ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for motif in (f'T{aa}T{x}T' for aa in 'AV' for x in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
+            automaton.add_word(motif, motif)
+        automaton.make_automaton()
+        ends = [end for end, _ in automaton.iter(buffer)]
+    else:
+        seq = np.frombuffer(data, dtype=np.uint8)
+        motif = ((seq[:-4] == ord('T')) &
+                 ((seq[1:-3] == ord('A')) | (seq[1:-3] == ord('V'))) &
+                 (seq[2:-2] == ord('T')) &
+                 (seq[3:-1] >= ord('A')) & (seq[3:-1] <= ord('Z')) &
+                 (seq[4:] == ord('T')))
+        ends = np.flatnonzero(motif) + 4
+
+    # Recover the row of each occurrence from its offset
+    hits = np.zeros(len(df), dtype=bool)
+    hits[np.searchsorted(starts, np.asarray(ends, dtype=np.int64), side='right') - 1] = True
+
+    matches = df[hits]
+    matches.set_index('protein_id', inplace=True)
+
+    print('\nIdentified hits using bulk scan:\n', matches)
+    return matches
+
 # Set filepaths
 dirty_file = os.path.join(data_dir, 'human_proteins_dirty.csv')
 clean_file = os.path.join(data_dir, 'human_proteins_clean.csv')
@@ -121,11 +192,12 @@ corrupt_df = diagnose_corruptions(dirty_file)
 clean_protein_file(dirty_file, clean_file)
 
 # Step 3: Load the cleaned file for analysis
-protein_df = pd.read_csv(clean_file, index_col=0)
+protein_df = pd.read_csv(clean_file, index_col=0, engine='pyarrow')
 
 # Step 4: Find sequences matching the T-AV-T-*-T motif pattern
 matches_combinatorics = find_pattern_combinations(protein_df)
 matches_regex = find_pattern_regex(protein_df)
+matches_bulk = find_pattern_bulk(protein_df)
 
 # Step 5: Save output
 matches_combinatorics.to_csv(os.path.join(data_dir, 'human_proteins_clean_patternX.csv'))
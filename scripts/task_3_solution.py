@@ -1,15 +1,13 @@
 # %%
 import os
 import sys
-import importlib
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 import protein_network_analyzer 
 
 # %%
 def run_analysis():
 
-    # Import classes and reload network analyzer, set directory path for task 3
-    importlib.reload(protein_network_analyzer)
+    # Set directory path for task 3
     path = os.path.dirname(__file__)
     task_3_dir = os.path.join(path, '..', 'task_3')
 
@@ -21,17 +19,15 @@ def run_analysis():
     )
 
     # Answer question 1
-    new_interactions = analyzer.select_crosscompartment_unobserved_interactions()
-    print("New potential interactions (unobserved and different compartments):")
-    print(new_interactions)
-    new_interactions.to_csv(os.path.join(task_3_dir, 'protein_answer1.csv'))
+    _, _, new_interactions = analyzer.select_crosscompartment_unobserved_interactions(as_mask=True)
+    print(f"New potential interactions (unobserved and different compartments): {new_interactions.sum()}")
+    analyzer.save_pairs(new_interactions, os.path.join(task_3_dir, 'protein_answer1.csv'))
     print(f"\nQ1 answer saved to: {os.path.join(task_3_dir, 'proteins_answer1.csv')}")
 
     # Answer question 2
-    filtered_pairs = analyzer.select_crossnetwork_crosscompartment_interactions()
-    print("\nFiltered pairs (different compartment and different network):")
-    print(filtered_pairs)
-    filtered_pairs.to_csv(os.path.join(task_3_dir, 'protein_answer2.csv'))
+    _, _, filtered_pairs = analyzer.select_crossnetwork_crosscompartment_interactions(as_mask=True)
+    print(f"\nFiltered pairs (different compartment and different network): {filtered_pairs.sum()}")
+    analyzer.save_pairs(filtered_pairs, os.path.join(task_3_dir, 'protein_answer2.csv'))
     print(f"\nQ2 answer saved to: {os.path.join(task_3_dir, 'proteins_answer2.csv')}")
 
 